@@ -1,128 +1,513 @@
-import boto3
+import aiodns
+from aiolimiter import AsyncLimiter
+import asyncio
+import base64
+import contextlib
 import json
-import socket
 import datetime
 import os
-from typing import Dict, List, Optional
+import re
+import collections
+import heapq
+from typing import Dict, Iterator, List, Optional
 import sys
-import requests
-import traceback
-from flask import Flask, request, jsonify
-import threading
+import logging
+import logging.handlers
+import queue
+import signal
+import httpx
+import uvicorn
+from quart import Quart, Response, request
 import time
 from dataclasses import dataclass
-import yaml
 
-app = Flask(__name__)
+def _json_default(obj):
+    """Serialize IP frozensets as sorted lists"""
+    if isinstance(obj, frozenset):
+        return sorted(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    import json as orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return (orjson.dumps(obj, default=_json_default, separators=(',', ':')) + '\n').encode()
+
+def _from_history(delegation_sets: Dict) -> Dict:
+    """Convert delegation sets loaded from history to the columnar in-memory form
+
+    Each zone is stored as parallel columns: 'ns' holds the sorted nameserver
+    names and 'ipv4'/'ipv6' hold one frozenset of addresses per nameserver.
+    Entries written before this layout nest a dict per nameserver instead.
+    Zone IDs and nameserver names are interned, as they are when read from Route53.
+    """
+    converted = {}
+    for zone_id, info in delegation_sets.items():
+        if 'nameservers' in info:
+            nameservers = sorted(info['nameservers'])
+            ipv4 = [info['nameservers'][ns].get('ipv4', ()) for ns in nameservers]
+            ipv6 = [info['nameservers'][ns].get('ipv6', ()) for ns in nameservers]
+        else:
+            nameservers, ipv4, ipv6 = info['ns'], info['ipv4'], info['ipv6']
+        
+        converted[sys.intern(zone_id)] = {
+            'zone_name': info['zone_name'],
+            'ns': tuple(sys.intern(ns) for ns in nameservers),
+            'ipv4': tuple(frozenset(ips) for ips in ipv4),
+            'ipv6': tuple(frozenset(ips) for ips in ipv6)
+        }
+    return converted
+
+# How often the append-only history file is compacted (seconds)
+HISTORY_COMPACTION_INTERVAL = 3600
+
+# Route53 change events for a zone checked this recently are ignored (seconds)
+EVENT_RECHECK_INTERVAL = 60
+
+# Number of zones checked at once; further due zones wait for a free worker
+MONITOR_CONCURRENCY = 16
+
+# Consecutive failed Route53 calls (after botocore's own retries) that pause
+# all checks, and how long they stay paused (seconds)
+R53_BREAKER_THRESHOLD = 5
+R53_BREAKER_RESET = 60
+
+# Route53 error codes that mean the service is throttling us rather than
+# rejecting the request
+_R53_THROTTLE_CODES = frozenset({'Throttling', 'ThrottlingException', 'PriorRequestNotComplete', 'RequestLimitExceeded'})
+
+logger = logging.getLogger(__name__)
+
+asgi_app = Quart(__name__)
+
+def _json_response(obj, status: int = 200) -> Response:
+    """JSON response encoded with orjson rather than Quart's stdlib-based jsonify"""
+    return Response(_dumps(obj), status=status, content_type='application/json')
+
 monitor = None  # Global variable to store monitor instance
+background_job = None  # Monitor coroutine run on the server's event loop
+_background_task = None
+_server = None  # Uvicorn server, so a failed monitor can shut it down
+_monitor_failed = False
+
+# Shared async HTTP client so Slack round-trips reuse pooled connections.
+# The timeout keeps a stalled Slack call from blocking a monitoring task.
+SLACK_TIMEOUT = 5
 
-@app.route('/slack/interactions', methods=['POST'])
-def handle_slack_interaction():
+# Changes detected within this many seconds are sent as one Slack message
+SLACK_COALESCE_WINDOW = 5
+_http = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=8, max_keepalive_connections=4)
+)
+
+# Slack payload templates, serialized once at import. String leaves hold
+# str.format() placeholders that are filled with JSON-escaped values.
+_ALERT_ZONE_TEMPLATE = {
+    "type": "section",
+    "text": {
+        "type": "mrkdwn",
+        "text": "{changes}"
+    },
+    "fields": [
+        {
+            "type": "mrkdwn",
+            "text": "*Domain:*\n{domain}"
+        },
+        {
+            "type": "mrkdwn",
+            "text": "*Detection Time:*\n{time}"
+        }
+    ]
+}
+
+# Mrkdwn for a zone's section text; escaped as a whole before substitution
+_ALERT_ZONE_HEADER = "📝 *Nameserver IP Change*\n*ID:* `/hostedzone/{delegation_set}`"
+_ALERT_NS_CHANGE = "*Nameserver:* `{ns}`\n*Previous IPs:* `{old}`\n*New IPs:* `{new}`"
+
+# Slack allows 50 blocks per message; the header and context blocks take two
+SLACK_MAX_ZONES_PER_ALERT = 48
+
+# Slack webhooks accept about one message per second; split alerts are spaced
+# this many seconds apart
+SLACK_BATCH_INTERVAL = 1
+
+_ALERT_TEMPLATE = {
+    "attachments": [
+        {
+            "color": "#FF0000",
+            "blocks": [
+                {
+                    "type": "header",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "🚨 Route53 Nameserver Alert! 🚨",
+                        "emoji": True
+                    }
+                },
+                "{change_blocks}",  # Replaced by the raw serialized change blocks
+                {
+                    "type": "context",
+                    "elements": [
+                        {
+                            "type": "mrkdwn",
+                            "text": "🔍 Route53 Nameserver Monitor"
+                        }
+                    ]
+                }
+            ]
+        },
+        {
+            "color": "#FF0000",
+            "blocks": [
+                {
+                    "type": "actions",
+                    "elements": [
+                        {
+                            "type": "button",
+                            "text": {
+                                "type": "plain_text",
+                                "text": "✅ Resolve",
+                                "emoji": True
+                            },
+                            "style": "primary",
+                            "action_id": "resolve_nameserver_change"
+                        }
+                    ]
+                }
+            ]
+        }
+    ]
+}
+
+_RESOLUTION_TEMPLATE = {
+    "attachments": [
+        {
+            "color": "#28A745",  # Green color for success
+            "blocks": [
+                {
+                    "type": "header",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "✅ Nameserver Recovery Detected",
+                        "emoji": True
+                    }
+                },
+                {
+                    "type": "section",
+                    "fields": [
+                        {
+                            "type": "mrkdwn",
+                            "text": "*Domain:*\n{domain}"
+                        },
+                        {
+                            "type": "mrkdwn",
+                            "text": "*Status:*\nAll nameserver configurations have been verified and updated."
+                        }
+                    ]
+                }
+            ]
+        }
+    ]
+}
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+def _compile_template(template) -> str:
+    """Serialize a payload template into a str.format() pattern"""
+    text = json.dumps(template, ensure_ascii=False, separators=(',', ':'))
+    text = text.replace('{', '{{').replace('}', '}}')
+    return re.sub(r'\{\{(\w+)\}\}', r'{\1}', text)
+
+_NO_SPACE = str.maketrans('', '', ' ')
+
+def _format_ips(ips: Dict) -> str:
+    """Format an IP set mapping compactly, e.g. {'ipv4':['192.0.2.1'],'ipv6':[]}"""
+    return str({family: sorted(addrs) for family, addrs in ips.items()}).translate(_NO_SPACE)
+
+def _json_escape(value) -> str:
+    """Escape a value for substitution into a compiled template"""
+    return json.dumps(str(value), ensure_ascii=False)[1:-1]
+
+_ALERT_ZONE_STR = _compile_template(_ALERT_ZONE_TEMPLATE)
+_ALERT_STR = _compile_template(_ALERT_TEMPLATE).replace('"{change_blocks}"', '{change_blocks}')
+_RESOLUTION_STR = _compile_template(_RESOLUTION_TEMPLATE)
+
+# Raw-payload patterns for resolve clicks, matched against the JSON-escaped form
+_DOMAIN_RE = re.compile(rb'"\*Domain:\*\\n([^"\\]+)"')
+_BLOCK_ACTIONS_RE = re.compile(rb'"type":\s*"block_actions"')
+# Confined to the first action object, which is the one the parsed path reads
+_RESOLVE_ACTION_RE = re.compile(rb'"actions":\s*\[\s*\{[^}]*"action_id":\s*"resolve_nameserver_change"')
+
+async def _send_resolution(domains: List[str]):
+    """Post one resolution message to Slack covering every domain in the alert"""
+    # Alerts coalesce several zones, and their domains repeat across split messages
+    domains = list(dict.fromkeys(domains))
+    domain = ', '.join(domains)
+    logger.debug("🔍 Found domains: %s", domain)
+    resolution_payload = _RESOLUTION_STR.format(domain=_json_escape(domain)).encode()
+    
+    try:
+        webhook_url = monitor.slack_webhook
+        logger.debug("🔄 Sending resolution message to %s", webhook_url)
+        response = await _http.post(
+            webhook_url, content=resolution_payload, headers=_JSON_HEADERS, timeout=SLACK_TIMEOUT
+        )
+        logger.debug("📤 Slack response status: %s", response.status_code)
+        
+        if response.status_code != 200:
+            logger.error("❌ Error sending resolution message for %s: %s", domain, response.status_code)
+            logger.error("Response: %s", response.text)
+        else:
+            logger.info("✅ Sent resolution message for %s", domain)
+            
+        return _json_response({
+            "response_type": "in_channel",
+            "delete_original": False,
+            "text": "✅ Resolution processed successfully"
+        })
+            
+    except Exception as e:
+        logger.exception("❌ Error sending resolution message: %s", e)
+        return _json_response({'error': str(e)}, 500)
+
+@asgi_app.route('/slack/interactions', methods=['POST'])
+async def handle_slack_interaction():
     """Handle Slack button clicks"""
-    print("🔄 Received Slack interaction")
+    logger.debug("🔄 Received Slack interaction")
     
     try:
         # Handle form-encoded data from Slack
-        if not request.form.get('payload'):
-            print("❌ No payload received")
-            return jsonify({'error': 'No payload received'}), 400
+        form = await request.form
+        if not form.get('payload'):
+            logger.warning("❌ No payload received")
+            return _json_response({'error': 'No payload received'}, 400)
+
+        raw = form['payload'].encode()
+        
+        # Fast path: resolve clicks carry the domains in the alert, no need to parse
+        domains = [match.group(1).decode().strip() for match in _DOMAIN_RE.finditer(raw)]
+        if domains and _BLOCK_ACTIONS_RE.search(raw) and _RESOLVE_ACTION_RE.search(raw):
+            logger.debug("✅ Resolve button clicked")
+            return await _send_resolution(domains)
 
-        payload = json.loads(request.form.get('payload'))
-        print(f"✅ Received payload structure: {json.dumps(payload, indent=2)}")
+        payload = _loads(raw)
+        logger.debug("✅ Received payload structure: %s", payload)
             
         if payload.get('type') == 'block_actions':
             action = payload['actions'][0]
             if action['action_id'] == 'resolve_nameserver_change':
-                print("✅ Resolve button clicked")
+                logger.debug("✅ Resolve button clicked")
                 
-                # Get the domain from the message attachments
+                # Get every domain from the message attachments
                 message = payload.get('message', {})
                 attachments = message.get('attachments', [])
-                domain = None
+                domains = []
                 
                 for attachment in attachments:
                     for block in attachment.get('blocks', []):
                         if block.get('fields'):
                             for field in block['fields']:
                                 if '*Domain:*' in field.get('text', ''):
-                                    domain = field['text'].split('\n')[1].strip()
-                                    break
+                                    domains.append(field['text'].split('\n')[1].strip())
                 
-                if domain:
-                    print(f"🔍 Found domain: {domain}")
-                    resolution_payload = {
-                        "attachments": [
-                            {
-                                "color": "#28A745",  # Green color for success
-                                "blocks": [
-                                    {
-                                        "type": "header",
-                                        "text": {
-                                            "type": "plain_text",
-                                            "text": "✅ Nameserver Recovery Detected",
-                                            "emoji": True
-                                        }
-                                    },
-                                    {
-                                        "type": "section",
-                                        "fields": [
-                                            {
-                                                "type": "mrkdwn",
-                                                "text": f"*Domain:*\n{domain}"
-                                            },
-                                            {
-                                                "type": "mrkdwn",
-                                                "text": "*Status:*\nAll nameserver configurations have been verified and updated."
-                                            }
-                                        ]
-                                    }
-                                ]
-                            }
-                        ]
-                    }
-                    
-                    try:
-                        webhook_url = monitor.config['slack']['webhooks']['prod']
-                        print(f"🔄 Sending resolution message to {webhook_url}")
-                        response = requests.post(webhook_url, json=resolution_payload)
-                        print(f"📤 Slack response status: {response.status_code}")
-                        
-                        if response.status_code != 200:
-                            print(f"❌ Error sending resolution message for {domain}: {response.status_code}")
-                            print(f"Response: {response.text}")
-                        else:
-                            print(f"✅ Sent resolution message for {domain}")
-                            
-                        return jsonify({
-                            "response_type": "in_channel",
-                            "delete_original": False,
-                            "text": "✅ Resolution processed successfully"
-                        }), 200
-                            
-                    except Exception as e:
-                        print(f"❌ Error sending resolution message: {e}")
-                        print(traceback.format_exc())
-                        return jsonify({'error': str(e)}), 500
+                if domains:
+                    return await _send_resolution(domains)
                 else:
-                    print("❌ Could not find domain in message")
-                    print(f"Message structure: {json.dumps(message, indent=2)}")
-                    return jsonify({'error': 'Domain not found'}), 400
+                    logger.warning("❌ Could not find domain in message")
+                    logger.debug("Message structure: %s", message)
+                    return _json_response({'error': 'Domain not found'}, 400)
                 
     except Exception as e:
-        print(f"❌ Error handling Slack interaction: {e}")
-        print(traceback.format_exc())
-        return jsonify({'error': str(e)}), 500
+        logger.exception("❌ Error handling Slack interaction: %s", e)
+        return _json_response({'error': str(e)}, 500)
     
-    return jsonify({'error': 'Unknown action'}), 400
+    return _json_response({'error': 'Unknown action'}, 400)
 
-def start_flask_server():
-    """Start the Flask server"""
+# Only confirm subscriptions and fetch signing certificates from the SNS API itself
+_SNS_URL_RE = re.compile(r'https://sns\.[a-z0-9-]+\.amazonaws\.com/')
+_SNS_CERT_URL_RE = re.compile(r'https://sns\.[a-z0-9-]+\.amazonaws\.com/[^?#]+\.pem')
+
+# Fields covered by an SNS message signature, in signing order
+_SNS_SIGNED_FIELDS = {
+    'Notification': ('Message', 'MessageId', 'Subject', 'Timestamp', 'TopicArn', 'Type'),
+    'SubscriptionConfirmation': ('Message', 'MessageId', 'SubscribeURL', 'Timestamp', 'Token', 'TopicArn', 'Type'),
+}
+
+# SigningCertURL -> certificate public key
+_sns_keys: Dict[str, object] = {}
+
+async def _verify_sns_signature(envelope: Dict) -> bool:
+    """Check an SNS message against the AWS certificate it was signed with"""
+    # Only needed when change events are enabled; defer like the AWS SDKs
+    from cryptography import x509
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+    
+    fields = _SNS_SIGNED_FIELDS.get(envelope.get('Type'))
+    cert_url = envelope.get('SigningCertURL', '')
+    algorithm = {'1': hashes.SHA1, '2': hashes.SHA256}.get(envelope.get('SignatureVersion'))
+    if fields is None or algorithm is None or not _SNS_CERT_URL_RE.fullmatch(cert_url):
+        return False
+    
+    public_key = _sns_keys.get(cert_url)
+    if public_key is None:
+        response = await _http.get(cert_url, timeout=SLACK_TIMEOUT)
+        response.raise_for_status()
+        public_key = x509.load_pem_x509_certificate(response.content).public_key()
+        _sns_keys[cert_url] = public_key
+    
+    string_to_sign = ''.join(
+        f"{field}\n{envelope[field]}\n" for field in fields if envelope.get(field) is not None
+    ).encode()
     try:
-        print("Starting Flask server...")
-        app.run(host='0.0.0.0', port=3000)
+        public_key.verify(
+            base64.b64decode(envelope.get('Signature', '')), string_to_sign, padding.PKCS1v15(), algorithm()
+        )
+    except (InvalidSignature, ValueError):
+        return False
+    return True
+
+@asgi_app.route('/webhook/route53', methods=['POST'])
+async def handle_route53_event():
+    """Check a zone right away when EventBridge reports a Route53 change over SNS"""
+    try:
+        envelope = _loads(await request.get_data())
+        message_type = envelope.get('Type')
+        if message_type not in _SNS_SIGNED_FIELDS or monitor is None:
+            return _json_response({'status': 'ignored'})
+        
+        # Only accept signed messages from the topics we subscribed to
+        topic_arn = envelope.get('TopicArn')
+        if topic_arn not in monitor.sns_topic_arns:
+            logger.warning("❌ Rejecting SNS message from unknown topic %s", topic_arn)
+            return _json_response({'error': 'Unknown topic'}, 403)
+        if not await _verify_sns_signature(envelope):
+            logger.warning("❌ Rejecting SNS message with invalid signature from %s", topic_arn)
+            return _json_response({'error': 'Invalid signature'}, 403)
+        
+        if message_type == 'SubscriptionConfirmation':
+            subscribe_url = envelope.get('SubscribeURL', '')
+            if not _SNS_URL_RE.match(subscribe_url):
+                logger.warning("❌ Refusing SNS subscription URL: %s", subscribe_url)
+                return _json_response({'error': 'Invalid SubscribeURL'}, 400)
+            response = await _http.get(subscribe_url, timeout=SLACK_TIMEOUT)
+            response.raise_for_status()
+            logger.info("✅ Confirmed SNS subscription to %s", topic_arn)
+            return _json_response({'status': 'confirmed'})
+        
+        event = _loads(envelope['Message'])
+        zone_id = event.get('detail', {}).get('requestParameters', {}).get('hostedZoneId', '')
+        if zone_id and monitor.request_check(zone_id):
+            return _json_response({'status': 'scheduled'})
+        return _json_response({'status': 'ignored'})
+        
     except Exception as e:
-        print(f"Error starting Flask server: {e}")
-        print(traceback.format_exc())
+        logger.exception("❌ Error handling Route53 event: %s", e)
+        return _json_response({'error': str(e)}, 500)
+
+@asgi_app.before_serving
+async def start_background_job():
+    """Run the monitor on the same event loop that serves requests"""
+    global _background_task
+    logger.info("✅ Uvicorn server started on port 3000")
+    if background_job is not None:
+        _background_task = asyncio.create_task(background_job())
+        _background_task.add_done_callback(_background_job_done)
+
+def _background_job_done(task: asyncio.Task):
+    """Shut the server down if the monitor dies, rather than serving with no monitoring"""
+    global _monitor_failed
+    if task.cancelled() or task.exception() is None:
+        return
+    logger.error("❌ Monitor stopped unexpectedly, shutting down", exc_info=task.exception())
+    _monitor_failed = True
+    if _server is not None:
+        _server.should_exit = True
+
+@asgi_app.after_serving
+async def stop_background_job():
+    """Stop the monitor when the server shuts down"""
+    if _background_task is not None:
+        monitor.stop()
+        _background_task.cancel()
+        # A failed monitor was already logged by _background_job_done
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await _background_task
+        await monitor.flush_notifications()
+    await _http.aclose()
+
+async def serve():
+    """Serve the API; Uvicorn handles Ctrl+C and SIGTERM by shutting down gracefully"""
+    logger.info("Starting Uvicorn server...")
+    # log_config=None leaves Uvicorn's loggers to propagate to our queued root handler
+    global _server
+    _server = uvicorn.Server(uvicorn.Config(
+        asgi_app, host='0.0.0.0', port=3000, http='httptools', log_config=None
+    ))
+    await _server.serve()
+
+_NO_IPS = {'ipv4': frozenset(), 'ipv6': frozenset()}
+
+# Zones often share nameservers, so answers are reused for their TTL, capped
+# so that a changed nameserver address is still noticed within a minute
+DNS_CACHE_MAX_TTL = 60
+
+# Upper bound on a single nameserver lookup (seconds)
+DNS_TIMEOUT = 5
+
+# Answers meaning "no addresses of this type", as opposed to a failed lookup
+_DNS_NO_ANSWER = (aiodns.error.ARES_ENODATA, aiodns.error.ARES_ENOTFOUND)
+
+# (nameserver, query type) -> (monotonic expiry, addresses)
+_dns_cache: Dict[tuple, tuple] = {}
+
+async def _lookup(resolver: aiodns.DNSResolver, ns: str, qtype: str) -> frozenset:
+    """Query one address family for a nameserver, empty if it has none"""
+    key = (ns, qtype)
+    cached = _dns_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    
+    try:
+        result = await asyncio.wait_for(resolver.query_dns(ns, qtype), DNS_TIMEOUT)
+    except aiodns.error.DNSError as e:
+        # Timeouts and server failures fail the check instead of looking like an IP change
+        if e.args[0] not in _DNS_NO_ANSWER:
+            raise
+        logger.debug("No %s records found for %s: %s", qtype, ns, e)
+        return frozenset()
+    
+    # The answer section can also hold the CNAMEs that led to the addresses
+    records = [record for record in result.answer if hasattr(record.data, 'addr')]
+    if not records:
+        logger.debug("No %s records found for %s", qtype, ns)
+        return frozenset()
+    
+    ips = frozenset(record.data.addr for record in records)
+    ttl = min([DNS_CACHE_MAX_TTL] + [record.ttl for record in records])
+    _dns_cache[key] = (time.monotonic() + ttl, ips)
+    return ips
+
+async def _resolve(resolver: aiodns.DNSResolver, ns: str):
+    """Resolve IPv4 and IPv6 addresses for a nameserver concurrently"""
+    ipv4_ips, ipv6_ips = await asyncio.gather(
+        _lookup(resolver, ns, 'A'), _lookup(resolver, ns, 'AAAA')
+    )
+    if not ipv4_ips and not ipv6_ips:
+        logger.warning("No addresses found for %s", ns)
+    logger.debug("Addresses for %s: IPv4 %s, IPv6 %s", ns, sorted(ipv4_ips), sorted(ipv6_ips))
+    return ipv4_ips, ipv6_ips
 
 @dataclass
 class HostedZone:
@@ -133,49 +518,86 @@ class HostedZone:
     environment: str
     check_frequency: int
 
+def _route53_unavailable(e: Exception) -> bool:
+    """Whether a failed Route53 call points at throttling, a 5xx or the connection"""
+    response = getattr(e, 'response', None)
+    if isinstance(response, dict):
+        # botocore ClientError
+        code = response.get('Error', {}).get('Code')
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        return code in _R53_THROTTLE_CODES or status >= 500
+    if isinstance(e, (OSError, asyncio.TimeoutError)):
+        return True
+    from botocore.exceptions import ConnectionError as BotoConnectionError, HTTPClientError
+    return isinstance(e, (BotoConnectionError, HTTPClientError))
+
 class Route53NameserverMonitor:
     def __init__(self):
         """Initialize the monitor"""
+        # AWS SDK imports are heavy; defer them until a monitor is created
+        import aioboto3
+        from aiobotocore.config import AioConfig
+        
         try:
-            print("Initializing Route53 Nameserver Monitor...")
+            logger.info("Initializing Route53 Nameserver Monitor...")
             
             # Load config
             self.config = self.load_config()
-            print("✅ Loaded configuration")
-            
-            # Check where credentials are coming from
-            session = boto3.Session()
-            credentials = session.get_credentials()
-            
-            if credentials:
-                print(f"🔑 AWS Credentials found from: {credentials.method}")
-                print(f"🔑 Using AWS Access Key ID: {credentials.access_key[:5]}...")
-                if 'AWS_ACCESS_KEY_ID' in os.environ:
-                    print("📝 Using credentials from environment variables")
-                elif os.path.exists(os.path.expanduser('~/.aws/credentials')):
-                    print("📝 Using credentials from AWS CLI configuration")
-            else:
-                print("⚠️ No AWS credentials found!")
+            self.slack_webhook = self.config['slack']['webhooks']['prod']
+            # SNS topics allowed to post Route53 change events, see /webhook/route53
+            self.sns_topic_arns = frozenset(self.config.get('aws', {}).get('sns_topic_arns', []))
+            logger.info("✅ Loaded configuration")
+            
+            # One session for the credential check and the Route53 client, which
+            # is opened on the event loop, see _aws(). Keep-alive connections are
+            # shared by all workers and adaptive retries back off under throttling.
+            self._aws_session = aioboto3.Session()
+            self._route53_config = AioConfig(
+                retries={'mode': 'adaptive', 'max_attempts': 10},
+                tcp_keepalive=True,
+                max_pool_connections=MONITOR_CONCURRENCY
+            )
+            self.route53_client = None
             
-            # Initialize AWS client
-            self.route53_client = boto3.client('route53')
-            print("✅ Initialized AWS client")
+            # Hosted zone name -> ID cache, refreshed hourly
+            self._zone_id_cache: Dict[str, str] = {}
+            self._zone_cache_expiry = 0.0  # time.monotonic() deadline
+            self._zone_cache_lock = None
+            self._r53_limiter = None
+            # Circuit breaker over Route53 calls, see _route53()
+            self._r53_failures = 0
+            self._r53_open_until = 0.0  # time.monotonic() deadline
+            self._resolver = None  # aiodns resolver, bound to the event loop on first use
             
             # Initialize zones
             self.zones = self.initialize_zones()
-            print(f"✅ Initialized {len(self.zones)} zones")
+            logger.info("✅ Initialized %d zones", len(self.zones))
             
             # Set up history file
-            self.history_file = os.path.join('data', 'nameserver_history.json')
-            print(f"✅ History file path: {self.history_file}")
+            self.history_file = self.config.get('aws', {}).get(
+                'history_file', os.path.join('data', 'nameserver_history.jsonl')
+            )
+            logger.info("✅ History file path: %s", self.history_file)
+            self._last_compaction = float('-inf')  # time.monotonic() of the last compaction
+            self._migrate_legacy_history()
+            
+            # Last known state per zone ID, seeded once from history
+            self._last_state: Dict[str, Dict] = {}
+            for entry in self.load_history(self.history_file):
+                self._last_state.update(_from_history(entry["delegation_sets"]))
             
-            # Initialize monitoring threads dictionary
-            self.monitoring_threads = {}
             self.stop_monitoring = False
+            self._loop = None
+            self._wakeup = None
+            self._schedule = None
+            self._last_checked: Dict[str, float] = {}  # Zone name -> time.monotonic() of last check
+            
+            # Changes waiting to be sent to Slack, see send_slack_notification()
+            self._pending_changes = collections.deque()
+            self._flush_task = None
             
         except Exception as e:
-            print(f"❌ Error initializing monitor: {e}")
-            print(traceback.format_exc())
+            logger.exception("❌ Error initializing monitor: %s", e)
             raise
 
     def initialize_zones(self) -> List[HostedZone]:
@@ -192,7 +614,7 @@ class Route53NameserverMonitor:
                 for zone in zone_list:
                     # Use zone-specific frequency if provided, otherwise use environment default
                     frequency = zone.get('check_frequency', default_freq)
-                    print(f"🕒 Zone {zone['name']} frequency: {frequency} seconds")
+                    logger.info("🕒 Zone %s frequency: %s seconds", zone['name'], frequency)
                     
                     zones.append(HostedZone(
                         name=zone['name'],
@@ -205,240 +627,366 @@ class Route53NameserverMonitor:
                     
             return zones
         except Exception as e:
-            print(f"❌ Error initializing zones: {e}")
-            print(traceback.format_exc())
+            logger.exception("❌ Error initializing zones: %s", e)
             raise
 
-    def monitor_zone(self, zone: HostedZone):
-        """Monitor a specific zone at its configured frequency"""
-        print(f"🔄 Starting monitoring for {zone.name} (checking every {zone.check_frequency} seconds)")
+    @contextlib.asynccontextmanager
+    async def _aws(self):
+        """Open the Route53 client for the duration of the block"""
+        await self._log_credentials()
+        async with self._aws_session.client('route53', config=self._route53_config) as client:
+            self.route53_client = client
+            self._zone_cache_lock = asyncio.Lock()
+            # Route53 allows 5 requests per second per account
+            self._r53_limiter = AsyncLimiter(5, 1)
+            logger.info("✅ Initialized AWS client")
+            try:
+                yield
+            finally:
+                self.route53_client = None
+
+    async def _log_credentials(self):
+        """Log where the AWS credentials are coming from"""
+        credentials = await self._aws_session.get_credentials()
+        
+        if credentials:
+            frozen = await credentials.get_frozen_credentials()
+            logger.info("🔑 AWS Credentials found from: %s", credentials.method)
+            logger.info("🔑 Using AWS Access Key ID: %s...", frozen.access_key[:5])
+            if 'AWS_ACCESS_KEY_ID' in os.environ:
+                logger.info("📝 Using credentials from environment variables")
+            elif os.path.exists(os.path.expanduser('~/.aws/credentials')):
+                logger.info("📝 Using credentials from AWS CLI configuration")
+        else:
+            logger.warning("⚠️ No AWS credentials found!")
+
+    async def check_zone(self, zone: HostedZone):
+        """Check a zone once and alert on any changes"""
+        logger.debug("🔍 Checking zone: %s", zone.name)
+        current_state = await self.get_zone_nameserver_ips(zone)
         
+        if current_state:
+            logger.debug("✅ Got current state for %s", zone.name)
+            changes = self.check_for_changes(current_state)
+            if changes:
+                logger.warning("🚨 Found changes for %s", zone.name)
+                await self.send_slack_notification(changes)
+            else:
+                logger.debug("✅ No changes detected for %s", zone.name)
+            
+            self.save_current_state(current_state)
+        else:
+            logger.error("❌ No state retrieved for %s", zone.name)
+
+    async def _worker(self, schedule: List, ready: asyncio.Queue):
+        """Check zones handed out by the dispatcher and put them back on the schedule"""
+        while True:
+            index, zone = await ready.get()
+            paused = self._r53_open_until - time.monotonic()
+            if paused > 0:
+                # Route53 circuit is open; check again once it closes
+                delay = paused
+                logger.debug("⏸️ %s: Route53 paused, next check in %.0f seconds", zone.name, delay)
+            else:
+                self._last_checked[zone.name] = time.monotonic()
+                try:
+                    await self.check_zone(zone)
+                    delay = zone.check_frequency
+                    logger.debug("💤 %s: Next check in %s seconds", zone.name, delay)
+                except Exception as e:
+                    logger.exception("❌ Error monitoring %s: %s", zone.name, e)
+                    delay = 60  # Wait a minute before retrying on error
+            
+            heapq.heappush(schedule, (time.monotonic() + delay, index, zone))
+            self._wakeup.set()
+
+    async def _dispatch(self, schedule: List, ready: asyncio.Queue):
+        """Hand zones to the workers as their checks come due"""
         while not self.stop_monitoring:
-            try:
-                print(f"\n🔍 Checking zone: {zone.name}")
-                current_state = self.get_zone_nameserver_ips(zone)
-                
-                if current_state:
-                    print(f"✅ Got current state for {zone.name}")
-                    changes = self.check_for_changes(current_state)
-                    if changes:
-                        print(f"🚨 Found changes for {zone.name}")
-                        self.send_slack_notification(changes)
-                    else:
-                        print(f"✅ No changes detected for {zone.name}")
-                    
-                    self.save_current_state(current_state)
-                else:
-                    print(f"❌ No state retrieved for {zone.name}")
-                
-                # Sleep for the zone-specific frequency
-                print(f"💤 {zone.name}: Sleeping for {zone.check_frequency} seconds...")
-                time.sleep(zone.check_frequency)
-                
-            except Exception as e:
-                print(f"❌ Error monitoring {zone.name}: {e}")
-                print(traceback.format_exc())
-                time.sleep(60)  # Wait a minute before retrying on error
+            delay = schedule[0][0] - time.monotonic() if schedule else None
+            if delay is None or delay > 0:
+                # Sleep until the next zone is due, a zone is rescheduled, or we are stopped
+                self._wakeup.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                continue
+            
+            _, index, zone = heapq.heappop(schedule)
+            ready.put_nowait((index, zone))
 
-    def start_monitoring(self):
-        """Start monitoring threads for all zones"""
+    def request_check(self, zone_id: str) -> bool:
+        """Move a zone's next check forward to now; False if it isn't waiting on the schedule"""
+        if self._schedule is None:
+            return False
+        
+        # Route53 returns IDs as /hostedzone/<id>, CloudTrail usually as the bare <id>
+        zone_id = zone_id.rsplit('/', 1)[-1]
+        now = time.monotonic()
+        for position, (due, index, zone) in enumerate(self._schedule):
+            if self._zone_id_cache.get(zone.name, '').rsplit('/', 1)[-1] == zone_id:
+                # Bursts of events must not spend the Route53 quota on repeat checks
+                last_checked = self._last_checked.get(zone.name, float('-inf'))
+                if due <= now or now - last_checked < EVENT_RECHECK_INTERVAL:
+                    logger.debug("Route53 change event for %s ignored, checked or queued recently", zone.name)
+                    return False
+                self._schedule[position] = (now, index, zone)
+                heapq.heapify(self._schedule)
+                self._wakeup.set()
+                logger.info("⚡ Route53 change event for %s, checking now", zone.name)
+                return True
+        return False
+
+    def stop(self):
+        """Stop monitoring; safe to call from any thread"""
+        self.stop_monitoring = True
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start_monitoring(self):
+        """Monitor all zones with a fixed pool of workers on the running event loop"""
         try:
-            print("Starting monitoring threads...")
+            logger.info("Starting monitoring tasks...")
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            
+            # Heap of (due time, tie-breaker, zone); every zone is due immediately
+            now = time.monotonic()
+            schedule = [(now, index, zone) for index, zone in enumerate(self.zones)]
+            self._schedule = schedule
+            ready = asyncio.Queue()
             for zone in self.zones:
-                thread = threading.Thread(
-                    target=self.monitor_zone,
-                    args=(zone,),
-                    name=f"monitor-{zone.name}"
-                )
-                thread.daemon = True
-                thread.start()
-                self.monitoring_threads[zone.name] = thread
-                print(f"✅ Started monitoring thread for {zone.name} (frequency: {zone.check_frequency}s)")
+                logger.info("🔄 Starting monitoring for %s (checking every %s seconds)", zone.name, zone.check_frequency)
+            
+            async with self._aws():
+                workers = [
+                    asyncio.create_task(self._worker(schedule, ready))
+                    for _ in range(min(MONITOR_CONCURRENCY, len(self.zones)))
+                ]
+                try:
+                    await self._dispatch(schedule, ready)
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
                 
         except Exception as e:
-            print(f"❌ Error starting monitoring: {e}")
-            print(traceback.format_exc())
+            logger.exception("❌ Error starting monitoring: %s", e)
+            raise
+
+    async def _route53(self, operation: str, **kwargs) -> Dict:
+        """Call Route53 under the rate limiter, opening the circuit after repeated failures"""
+        try:
+            async with self._r53_limiter:
+                response = await getattr(self.route53_client, operation)(**kwargs)
+        except Exception as e:
+            # Per-zone errors (NoSuchHostedZone, AccessDenied, ...) say nothing
+            # about Route53's health and must not pause every other zone
+            if not _route53_unavailable(e):
+                raise
+            self._r53_failures += 1
+            now = time.monotonic()
+            # Once past the threshold, a single failure after the pause reopens the circuit
+            if self._r53_failures >= R53_BREAKER_THRESHOLD and now >= self._r53_open_until:
+                self._r53_open_until = now + R53_BREAKER_RESET
+                logger.error("🔌 %d Route53 calls failed in a row, pausing checks for %s seconds",
+                             self._r53_failures, R53_BREAKER_RESET)
             raise
+        
+        self._r53_failures = 0
+        return response
 
-    def get_zone_nameserver_ips(self, zone: HostedZone) -> Dict[str, Dict]:
+    async def _refresh_zone_ids(self):
+        """Rebuild the zone name -> zone ID cache from Route53"""
+        # Only keep the zones we monitor, and stop paging once all are found
+        wanted = {zone.name for zone in self.zones}
+        zone_ids = {}
+        kwargs = {'MaxItems': '100'}
+        while True:
+            page = await self._route53('list_hosted_zones_by_name', **kwargs)
+            for hz in page['HostedZones']:
+                zone_name = hz['Name'].rstrip('.')
+                if zone_name in wanted:
+                    zone_ids[zone_name] = sys.intern(hz['Id'])
+            if not page['IsTruncated'] or len(zone_ids) == len(wanted):
+                break
+            kwargs['DNSName'] = page['NextDNSName']
+            kwargs['HostedZoneId'] = page['NextHostedZoneId']
+        
+        self._zone_id_cache = zone_ids
+        self._zone_cache_expiry = time.monotonic() + 3600
+        logger.info("✅ Cached %d hosted zone IDs", len(zone_ids))
+
+    async def _zone_id_for(self, name: str) -> Optional[str]:
+        """Look up a hosted zone ID by name, refreshing the cache when stale"""
+        async with self._zone_cache_lock:
+            if time.monotonic() > self._zone_cache_expiry:
+                await self._refresh_zone_ids()
+            return self._zone_id_cache.get(name)
+
+    async def get_zone_nameserver_ips(self, zone: HostedZone) -> Dict[str, Dict]:
         """Collect current nameserver IPs from Route53"""
-        print(f"Getting nameserver IPs for {zone.name}")
+        logger.debug("Getting nameserver IPs for %s", zone.name)
         delegation_sets = {}
-        api_calls = 0
         
         try:
-            api_calls += 1
-            hosted_zones = self.route53_client.list_hosted_zones()
-            print(f"API Call #{api_calls}: list_hosted_zones")
+            zone_id = await self._zone_id_for(zone.name)
+            if not zone_id:
+                logger.error("❌ Hosted zone not found: %s", zone.name)
+                return {}
             
-            for hz in hosted_zones['HostedZones']:
-                zone_name = hz['Name'].rstrip('.')
-                
-                if zone_name == zone.name:
-                    zone_id = hz['Id']
-                    api_calls += 1
-                    zone_details = self.route53_client.get_hosted_zone(Id=zone_id)
-                    print(f"API Call #{api_calls}: get_hosted_zone for {zone_name}")
-                    nameservers = zone_details['DelegationSet']['NameServers']
-                    
-                    nameservers_info = {}
-                    for ns in nameservers:
-                        try:
-                            # Get both IPv4 and IPv6 addresses
-                            ipv4_ips = []
-                            ipv6_ips = []
-                            
-                            # Get IPv4 addresses
-                            try:
-                                ipv4_info = socket.getaddrinfo(ns, None, socket.AF_INET)
-                                ipv4_ips = list(set(info[4][0] for info in ipv4_info))
-                                print(f"IPv4 addresses for {ns}: {ipv4_ips}")
-                            except socket.gaierror as e:
-                                print(f"No IPv4 addresses found for {ns}: {e}")
-                                
-                            # Get IPv6 addresses
-                            try:
-                                ipv6_info = socket.getaddrinfo(ns, None, socket.AF_INET6)
-                                ipv6_ips = list(set(info[4][0] for info in ipv6_info))
-                                print(f"IPv6 addresses for {ns}: {ipv6_ips}")
-                            except socket.gaierror as e:
-                                print(f"No IPv6 addresses found for {ns}: {e}")
-                                
-                            nameservers_info[ns] = {
-                                'ipv4': ipv4_ips,
-                                'ipv6': ipv6_ips
-                            }
-                        except Exception as e:
-                            print(f"Error resolving {ns}: {e}")
-                            nameservers_info[ns] = {'ipv4': [], 'ipv6': []}
-                    
-                    delegation_sets[zone_id] = {
-                        "zone_name": zone_name,
-                        "nameservers": nameservers_info
-                    }
+            # The apex NS record carries the same nameservers as the delegation set
+            response = await self._route53(
+                'list_resource_record_sets',
+                HostedZoneId=zone_id,
+                StartRecordName=zone.name + '.',
+                StartRecordType='NS',
+                MaxItems='1'
+            )
+            logger.debug("API Call: list_resource_record_sets for %s", zone.name)
+            
+            record_sets = response['ResourceRecordSets']
+            if not record_sets or record_sets[0]['Type'] != 'NS':
+                logger.error("❌ No apex NS record found for %s", zone.name)
+                return {}
+            # Interned so they share storage (and compare by identity) with the last state
+            nameservers = sorted(sys.intern(r['Value'].rstrip('.')) for r in record_sets[0]['ResourceRecords'])
+            
+            if self._resolver is None:
+                self._resolver = aiodns.DNSResolver()
+            resolved = await asyncio.gather(*(_resolve(self._resolver, ns) for ns in nameservers))
+            
+            delegation_sets[zone_id] = {
+                "zone_name": zone.name,
+                "ns": tuple(nameservers),
+                "ipv4": tuple(ipv4 for ipv4, _ in resolved),
+                "ipv6": tuple(ipv6 for _, ipv6 in resolved)
+            }
                     
             return delegation_sets
             
+        except (asyncio.TimeoutError, aiodns.error.DNSError) as e:
+            # Resolver timeouts are routine and retried next cycle; no traceback needed
+            logger.warning("⚠️ Could not resolve nameservers for %s: %r", zone.name, e)
+            return {}
         except Exception as e:
-            print(f"❌ Error getting nameserver information: {e}")
-            print(traceback.format_exc())
+            logger.exception("❌ Error getting nameserver information for %s: %s", zone.name, e)
             return {}
             
-    def load_history(self, history_file: str) -> Dict:
-        """Load previous nameserver data from JSON file"""
-        if os.path.exists(history_file):
-            try:
-                with open(history_file, 'r') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {"history": []}
-        return {"history": []}
-    
-    def _apply_retention_policy(self, history: Dict):
-        """Apply retention policies to history"""
-        if not history["history"]:
+    def _migrate_legacy_history(self):
+        """Convert a legacy nameserver_history.json file to JSONL"""
+        legacy_file = os.path.splitext(self.history_file)[0] + '.json'
+        if os.path.exists(self.history_file) or not os.path.exists(legacy_file):
             return
-            
-        current_time = datetime.datetime.now()
-        retained_entries = []
         
-        for entry in history["history"]:
-            entry_time = datetime.datetime.fromisoformat(entry["timestamp"])
-            age_days = (current_time - entry_time).days
-            
-            # Get retention settings from config
-            max_days = self.config.get('monitoring', {}).get('retention_days', 30)
-            max_entries = self.config.get('monitoring', {}).get('retention_entries', 1000)
-            
-            if age_days <= max_days:
-                retained_entries.append(entry)
+        try:
+            with open(legacy_file, 'rb') as f:
+                entries = _loads(f.read()).get("history", [])
+            with open(self.history_file, 'wb') as f:
+                f.writelines(
+                    _dumps({**entry, "delegation_sets": _from_history(entry["delegation_sets"])})
+                    for entry in entries
+                )
+            logger.info("✅ Migrated %d history entries from %s", len(entries), legacy_file)
+        except Exception as e:
+            logger.exception("❌ Error migrating legacy history: %s", e)
+
+    def load_history(self, history_file: str) -> Iterator[Dict]:
+        """Stream previous nameserver data from the JSONL history file"""
+        if not os.path.exists(history_file):
+            return
+        
+        with open(history_file, 'rb') as f:
+            for line in f:
+                try:
+                    yield _loads(line)
+                except json.JSONDecodeError:
+                    # Skip torn or corrupt lines
+                    continue
+    
+    def _apply_retention_policy(self, now: Optional[datetime.datetime] = None):
+        """Compact the history file according to retention policies"""
+        # Get retention settings from config
+        max_days = self.config.get('monitoring', {}).get('retention_days', 30)
+        max_entries = self.config.get('monitoring', {}).get('retention_entries', 1000)
         
-        # Keep only the most recent entries if we exceed max_entries
-        if len(retained_entries) > max_entries:
-            retained_entries = retained_entries[-max_entries:]
+        # Entries are kept while their age in whole days is <= max_days
+        now = now or datetime.datetime.now()
+        cutoff = (now - datetime.timedelta(days=max_days + 1)).isoformat()
         
-        history["history"] = retained_entries
+        with open(self.history_file, 'rb') as f:
+            lines = f.readlines()
+        
+        # Filter every line rather than bisecting: torn writes, hand edits or
+        # clock changes can leave the file out of time order
+        kept = []
+        for line in lines:
+            try:
+                timestamp = _loads(line)["timestamp"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue  # Drop torn or corrupt lines
+            if isinstance(timestamp, str) and timestamp > cutoff:
+                kept.append(line)
+        
+        tmp_file = self.history_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.writelines(kept[-max_entries:])
+        os.replace(tmp_file, self.history_file)
+        self._last_compaction = time.monotonic()
 
     def save_current_state(self, current_state: Dict):
-        """Save current state to history file"""
+        """Append current state to the history file if it changed"""
         try:
-            print(f"Creating directory: {os.path.dirname(self.history_file)}")
-            os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-            
-            history = self.load_history(self.history_file)
+            # The detailed diff lives in check_for_changes; only skip unchanged state here
+            if all(self._last_state.get(zone_id) == info for zone_id, info in current_state.items()):
+                logger.debug("✅ No changes detected, skipping save")
+                return
             
-            # Add new entry
+            logger.info("💾 Saving new state due to changes")
+            now = datetime.datetime.now()
             entry = {
-                "timestamp": datetime.datetime.now().isoformat(),
+                "timestamp": now.isoformat(),
                 "delegation_sets": current_state
             }
             
-            # Compare states with detailed logging
-            if not history.get("history"):
-                print("First entry in history")
-                history["history"] = [entry]
-            else:
-                last_state = history["history"][-1]["delegation_sets"]
-                state_changed = False
-                
-                # Compare each zone separately
-                for zone_id, current_info in current_state.items():
-                    if zone_id in last_state:
-                        if last_state[zone_id] != current_info:
-                            print(f"🚨 Changes detected for {current_info['zone_name']}:")
-                            print(f"Previous state: {json.dumps(last_state[zone_id], indent=2)}")
-                            print(f"Current state: {json.dumps(current_info, indent=2)}")
-                            state_changed = True
-                    else:
-                        print(f"🆕 New zone detected: {current_info['zone_name']}")
-                        state_changed = True
-                
-                if state_changed:
-                    print("💾 Saving new state due to changes")
-                    history["history"].append(entry)
-                else:
-                    print("✅ No changes detected, skipping save")
-                    return
+            os.makedirs(os.path.dirname(self.history_file) or '.', exist_ok=True)
+            with open(self.history_file, 'ab') as f:
+                f.write(_dumps(entry))
+            self._last_state.update(current_state)
             
-            # Apply retention policies
-            self._apply_retention_policy(history)
-            
-            with open(self.history_file, 'w') as f:
-                json.dump(history, f, indent=2)
+            # Apply retention policies on a coarse schedule
+            if time.monotonic() - self._last_compaction > HISTORY_COMPACTION_INTERVAL:
+                self._apply_retention_policy(now)
             
         except Exception as e:
-            print(f"❌ Error saving state: {e}")
-            print(traceback.format_exc())
+            logger.exception("❌ Error saving state: %s", e)
 
     def check_for_changes(self, current_state: Dict) -> List[Dict]:
         """Check for changes in nameserver IPs"""
         changes = []
         try:
-            history = self.load_history(self.history_file)
-            last_state = history.get("history", [])[-1] if history.get("history") else None
-            
-            if not last_state:
-                print("⚠️ No previous state found, establishing baseline")
-                return []
-            
-            last_delegation_sets = last_state["delegation_sets"]
-            
             for zone_id, current_info in current_state.items():
-                if zone_id not in last_delegation_sets:
-                    print(f"⚠️ New zone detected: {current_info['zone_name']}")
+                last_info = self._last_state.get(zone_id)
+                if last_info is None:
+                    logger.info("⚠️ No previous state for %s, establishing baseline", current_info['zone_name'])
                     continue
                 
-                last_info = last_delegation_sets[zone_id]
+                # Whole-column tuple compares short-circuit on the first mismatch
+                if (current_info['ipv4'] == last_info['ipv4'] and
+                        current_info['ipv6'] == last_info['ipv6'] and
+                        current_info['ns'] == last_info['ns']):
+                    continue
                 
-                for ns, current_ips in current_info["nameservers"].items():
-                    last_ips = last_info["nameservers"].get(ns, {'ipv4': [], 'ipv6': []})
+                last_index = {ns: i for i, ns in enumerate(last_info['ns'])}
+                for ns, ipv4, ipv6 in zip(current_info['ns'], current_info['ipv4'], current_info['ipv6']):
+                    i = last_index.get(ns)
+                    last_ips = _NO_IPS if i is None else {'ipv4': last_info['ipv4'][i], 'ipv6': last_info['ipv6'][i]}
+                    current_ips = {'ipv4': ipv4, 'ipv6': ipv6}
                     
-                    # Check both IPv4 and IPv6 changes
-                    if (current_ips.get('ipv4') != last_ips.get('ipv4') or 
-                        current_ips.get('ipv6') != last_ips.get('ipv6')):
-                        print(f"🚨 IP change detected for {ns} in {current_info['zone_name']}")
-                        print(f"Previous state: {last_ips}")
-                        print(f"Current state: {current_ips}")
+                    # Check both IPv4 and IPv6 changes; sets ignore resolver ordering
+                    if current_ips != last_ips:
+                        logger.warning("🚨 IP change detected for %s in %s", ns, current_info['zone_name'])
+                        logger.warning("Previous state: %s", last_ips)
+                        logger.warning("Current state: %s", current_ips)
                         
                         changes.append({
                             "type": "ip_change",
@@ -450,52 +998,52 @@ class Route53NameserverMonitor:
                         })
             
             if changes:
-                print(f"🚨 Found {len(changes)} changes")
+                logger.debug("🚨 Found %d changes", len(changes))
             else:
-                print("✅ No changes detected")
+                logger.debug("✅ No changes detected")
             
             return changes
             
         except Exception as e:
-            print(f"❌ Error checking for changes: {e}")
-            print(traceback.format_exc())
+            logger.exception("❌ Error checking for changes: %s", e)
             return []
 
-    def simulate_changes(self):
+    async def simulate_changes(self):
         """Test function to simulate changes"""
-        print("Starting simulation...")
+        logger.info("Starting simulation...")
         all_changes = {}
         
         for zone in self.zones:
-            print(f"\nTesting zone: {zone.name}")
-            current_state = self.get_zone_nameserver_ips(zone)
+            logger.info("Testing zone: %s", zone.name)
+            current_state = await self.get_zone_nameserver_ips(zone)
             
             if not current_state:
-                print(f"Error: No current state found for {zone.name}")
+                logger.error("Error: No current state found for %s", zone.name)
                 continue
             
             zone_id = list(current_state.keys())[0]
-            print(f"Found zone ID: {zone_id}")
+            logger.info("Found zone ID: %s", zone_id)
             
             # Simulate new IP
-            ns = list(current_state[zone_id]['nameservers'].keys())[0]
-            print(f"Modifying nameserver: {ns}")
+            ns = current_state[zone_id]['ns'][0]
+            logger.info("Modifying nameserver: %s", ns)
             
             # Store original state with example IPs
             original_state = {
-                'ipv4': ['205.251.195.19'],
-                'ipv6': []
+                'ipv4': frozenset({'205.251.195.19'}),
+                'ipv6': frozenset()
             }
             
             # Simulate new state with both IPv4 and IPv6 changes
             new_state = {
-                'ipv4': ['9.10.11.12'],
-                'ipv6': ['2001:db8::3']
+                'ipv4': frozenset({'9.10.11.12'}),
+                'ipv6': frozenset({'2001:db8::3'})
             }
             
-            print(f"Original state: {original_state}")
-            current_state[zone_id]['nameservers'][ns] = new_state
-            print(f"Modified state: {new_state}")
+            logger.info("Original state: %s", original_state)
+            current_state[zone_id]['ipv4'] = (new_state['ipv4'],) + current_state[zone_id]['ipv4'][1:]
+            current_state[zone_id]['ipv6'] = (new_state['ipv6'],) + current_state[zone_id]['ipv6'][1:]
+            logger.info("Modified state: %s", new_state)
             
             # Create the change record
             changes = [{
@@ -508,118 +1056,101 @@ class Route53NameserverMonitor:
             }]
             
             # Send test notification
-            self.send_slack_notification(changes)
+            await self.send_slack_notification(changes)
             
             all_changes[zone_id] = current_state[zone_id]
         
         return all_changes
 
-    def send_slack_notification(self, changes: List[Dict]):
-        """Send notification to Slack"""
-        try:
-            webhook_url = self.config['slack']['webhooks']['prod']
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            for change in changes:
-                if change["type"] == "ip_change":
-                    # Format IPs more compactly
-                    old_ips_str = str(change['old_ips']).replace(' ', '')
-                    new_ips_str = str(change['new_ips']).replace(' ', '')
-                    
-                    payload = {
-                        "attachments": [
-                            {
-                                "color": "#FF0000",
-                                "blocks": [
-                                    {
-                                        "type": "header",
-                                        "text": {
-                                            "type": "plain_text",
-                                            "text": "🚨 Route53 Nameserver Alert! 🚨",
-                                            "emoji": True
-                                        }
-                                    },
-                                    {
-                                        "type": "section",
-                                        "fields": [
-                                            {
-                                                "type": "mrkdwn",
-                                                "text": f"*Domain:*\n{change['zone_name']}"
-                                            },
-                                            {
-                                                "type": "mrkdwn",
-                                                "text": f"*Detection Time:*\n{current_time}"
-                                            }
-                                        ]
-                                    },
-                                    {
-                                        "type": "section",
-                                        "text": {
-                                            "type": "mrkdwn",
-                                            "text": f"📝 *Nameserver IP Change*\n*Zone:* {change['zone_name']}\n*ID:* `/hostedzone/{change['delegation_set']}`\n*Nameserver:* `{change['nameserver']}`"
-                                        }
-                                    },
-                                    {
-                                        "type": "section",
-                                        "fields": [
-                                            {
-                                                "type": "mrkdwn",
-                                                "text": f"*Previous IPs:*\n`{old_ips_str}`"
-                                            },
-                                            {
-                                                "type": "mrkdwn",
-                                                "text": f"*New IPs:*\n`{new_ips_str}`"
-                                            }
-                                        ]
-                                    },
-                                    {
-                                        "type": "context",
-                                        "elements": [
-                                            {
-                                                "type": "mrkdwn",
-                                                "text": "🔍 Route53 Nameserver Monitor"
-                                            }
-                                        ]
-                                    }
-                                ]
-                            },
-                            {
-                                "color": "#FF0000",
-                                "blocks": [
-                                    {
-                                        "type": "actions",
-                                        "elements": [
-                                            {
-                                                "type": "button",
-                                                "text": {
-                                                    "type": "plain_text",
-                                                    "text": "✅ Resolve",
-                                                    "emoji": True
-                                                },
-                                                "style": "primary",
-                                                "action_id": "resolve_nameserver_change"
-                                            }
-                                        ]
-                                    }
-                                ]
-                            }
-                        ]
-                    }
+    async def run_simulation(self):
+        """Send simulated change alerts to exercise the Slack integration"""
+        async with self._aws():
+            current_state = await self.simulate_changes()
+            if current_state:
+                logger.info("🔍 Checking for changes in simulated state...")
+                changes = self.check_for_changes(current_state)
+                if changes:
+                    logger.info("🚨 Found %d simulated changes", len(changes))
+                    await self.send_slack_notification(changes)
+                else:
+                    logger.error("❌ No changes detected in simulation")
+        logger.info("✅ Test completed")
+        logger.info("🔄 Keeping server running for testing resolve functionality...")
+        logger.info("Press Ctrl+C to exit")
+
+    async def send_slack_notification(self, changes: List[Dict]):
+        """Queue changes for Slack, coalescing those from the next few seconds into one message"""
+        self._pending_changes.extend(changes)
+        if self._pending_changes and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        """Send queued changes once the coalescing window closes"""
+        await asyncio.sleep(SLACK_COALESCE_WINDOW)
+        self._flush_task = None
+        await self.flush_notifications()
+
+    async def flush_notifications(self):
+        """Send all queued changes to Slack, one section per zone and as few messages as fit"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        changes = list(self._pending_changes)
+        self._pending_changes.clear()
+        
+        # Group nameserver changes by zone, keeping detection order
+        zone_changes: Dict[str, List[Dict]] = {}
+        for change in changes:
+            if change["type"] == "ip_change":
+                zone_changes.setdefault(change['zone_name'], []).append(change)
+        
+        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        zone_blocks = [
+            _ALERT_ZONE_STR.format(
+                domain=_json_escape(zone_name),
+                time=current_time,
+                changes=_json_escape('\n'.join(
+                    [_ALERT_ZONE_HEADER.format(delegation_set=zone[0]['delegation_set'])] +
+                    [_ALERT_NS_CHANGE.format(
+                        ns=change['nameserver'],
+                        old=_format_ips(change['old_ips']),
+                        new=_format_ips(change['new_ips'])
+                    ) for change in zone]
+                ))
+            )
+            for zone_name, zone in zone_changes.items()
+        ]
+        
+        # Split large bursts so no message exceeds Slack's block limit
+        for start in range(0, len(zone_blocks), SLACK_MAX_ZONES_PER_ALERT):
+            if start:
+                await asyncio.sleep(SLACK_BATCH_INTERVAL)
+            batch = zone_blocks[start:start + SLACK_MAX_ZONES_PER_ALERT]
+            try:
+                payload = _ALERT_STR.format(change_blocks=','.join(batch)).encode()
+                response = await _http.post(
+                    self.slack_webhook, content=payload, headers=_JSON_HEADERS, timeout=SLACK_TIMEOUT
+                )
+                if response.status_code == 429:
+                    # Rate limited anyway; wait as long as Slack asks and retry once
+                    retry_after = float(response.headers.get('Retry-After', SLACK_BATCH_INTERVAL))
+                    logger.warning("⏳ Slack rate limited, retrying in %s seconds", retry_after)
+                    await asyncio.sleep(retry_after)
+                    response = await _http.post(
+                        self.slack_webhook, content=payload, headers=_JSON_HEADERS, timeout=SLACK_TIMEOUT
+                    )
+                if response.status_code != 200:
+                    logger.error("❌ Error sending Slack notification. Status code: %s", response.status_code)
+                    logger.error("Response: %s", response.text)
                     
-                    response = requests.post(webhook_url, json=payload)
-                    if response.status_code != 200:
-                        print(f"❌ Error sending Slack notification. Status code: {response.status_code}")
-                        print(f"Response: {response.text}")
-                
-        except Exception as e:
-            print(f"❌ Error sending Slack notification: {e}")
-            print(traceback.format_exc())
+            except Exception as e:
+                logger.exception("❌ Error sending Slack notification: %s", e)
 
-    def test_slack_webhook(self):
+    async def test_slack_webhook(self):
         """Test the Slack webhook connection"""
-        webhook_url = self.config['slack']['webhooks']['prod']
+        webhook_url = self.slack_webhook
         if not webhook_url:
-            print("No Slack webhook URL configured!")
+            logger.error("No Slack webhook URL configured!")
             return False
             
         try:
@@ -627,27 +1158,28 @@ class Route53NameserverMonitor:
                 "text": "🔍 *Route53 Monitor Test*\n\nThis is a test message to verify Slack notifications are working."
             }
             
-            print(f"\nTesting Slack webhook connection...")
-            print(f"Webhook URL: {webhook_url}")
+            logger.info("Testing Slack webhook connection...")
+            logger.info("Webhook URL: %s", webhook_url)
             
-            response = requests.post(webhook_url, json=test_payload)
-            print(f"Response Status: {response.status_code}")
-            print(f"Response Text: {response.text}")
+            response = await _http.post(webhook_url, json=test_payload, timeout=SLACK_TIMEOUT)
+            logger.info("Response Status: %s", response.status_code)
+            logger.info("Response Text: %s", response.text)
             
             if response.status_code == 200:
-                print("✅ Slack webhook test successful!")
+                logger.info("✅ Slack webhook test successful!")
                 return True
             else:
-                print("❌ Slack webhook test failed!")
+                logger.error("❌ Slack webhook test failed!")
                 return False
                 
         except Exception as e:
-            print(f"Error testing Slack webhook: {e}")
-            print(traceback.format_exc())
+            logger.exception("Error testing Slack webhook: %s", e)
             return False
 
     def load_config(self) -> Dict:
         """Load and validate configuration"""
+        import yaml
+        
         try:
             with open('config.yaml', 'r') as f:
                 config = yaml.safe_load(f)
@@ -658,81 +1190,57 @@ class Route53NameserverMonitor:
                 if key not in config:
                     raise ValueError(f"Missing required config section: {key}")
                     
-            print(f"✅ Loaded configuration from config.yaml")
+            logger.info("✅ Loaded configuration from config.yaml")
             return config
                 
         except Exception as e:
-            print(f"❌ Error loading config from config.yaml: {e}")
+            logger.error("❌ Error loading config from config.yaml: %s", e)
             raise
 
-def notify_changes(changes: List[Dict], monitor: Route53NameserverMonitor):
-    """Notify about changes with enhanced formatting"""
-    if not changes:
-        return
-        
-    for change in changes:
-        if change["type"] == "ip_change":
-            message = (
-                "📝 *Nameserver IP Change*\n\n"
-                f"*Zone:* {change['zone_name']}\n"
-                f"*ID:* `/hostedzone/{change['delegation_set']}`\n"
-                f"*Nameserver:* `{change['nameserver']}`\n\n"
-                "*Previous IPs:*\n"
-                f"`{', '.join(change['old_ips'])}`\n\n"
-                "*New IPs:*\n"
-                f"`{', '.join(change['new_ips'])}`"
-            )
-            
-            # Send alert with resolve button
-            monitor.send_slack_notification([change])
-
 def main():
+    # Records are queued by the logging thread and written to stderr on a listener
+    # thread, so a slow log sink never blocks the event loop
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    root = logging.getLogger()
+    root.setLevel(os.environ.get('R53NS_LOG', 'WARNING').upper())
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
     try:
-        print("Starting Route53 Nameserver Monitor...")
-        global monitor
+        logger.info("Starting Route53 Nameserver Monitor...")
+        global monitor, background_job
         monitor = Route53NameserverMonitor()
         
-        # Start Flask server in a separate thread
-        flask_thread = threading.Thread(target=start_flask_server)
-        flask_thread.daemon = False  # Changed to non-daemon
-        flask_thread.start()
-        print("✅ Flask server started on port 3000")
-        
         if len(sys.argv) > 1 and sys.argv[1] == "--test":
-            print("\n🧪 Running in test mode...")
-            time.sleep(2)  # Give Flask time to start
-            current_state = monitor.simulate_changes()
-            if current_state:
-                print("\n🔍 Checking for changes in simulated state...")
-                changes = monitor.check_for_changes(current_state)
-                if changes:
-                    print(f"🚨 Found {len(changes)} simulated changes")
-                    monitor.send_slack_notification(changes)
-                else:
-                    print("❌ No changes detected in simulation")
-            print("\n✅ Test completed")
-            print("\n🔄 Keeping server running for testing resolve functionality...")
-            print("Press Ctrl+C to exit")
-            
-            # Keep the main thread alive
-            while True:
-                time.sleep(1)
+            logger.info("🧪 Running in test mode...")
+            background_job = monitor.run_simulation
         else:
-            # Start monitoring for all zones
-            monitor.start_monitoring()
-            print("\n✅ Monitoring started for all zones")
-            
-            # Keep the main thread alive
-            while True:
-                time.sleep(1)
+            # Monitoring for all zones runs on the server's event loop
+            background_job = monitor.start_monitoring
+        
+        with contextlib.suppress(ImportError):
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        
+        # Uvicorn shuts down gracefully on SIGTERM, then re-raises it with the
+        # previous handler restored; treat it like Ctrl+C so the cleanup below runs
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        
+        # The server and the monitor share one event loop on the main thread
+        asyncio.run(serve())
+        logger.info("Shutting down gracefully...")
                 
     except KeyboardInterrupt:
-        print("\nShutting down gracefully...")
-        if monitor:
-            monitor.stop_monitoring = True
+        logger.info("Shutting down gracefully...")
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("An error occurred: %s", e)
+    finally:
+        listener.stop()
+    
+    if _monitor_failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,12 @@
+"""Shared test setup"""
+import importlib.util
+import os
+import sys
+
+# The monitor is a script with a hyphenated name, so load it by path and
+# register it for the test modules to import as r53ns_monitor
+_SRC = os.path.join(os.path.dirname(__file__), '..', 'src', 'r53ns-monitor.py')
+_spec = importlib.util.spec_from_file_location('r53ns_monitor', _SRC)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules['r53ns_monitor'] = _module
+_spec.loader.exec_module(_module)
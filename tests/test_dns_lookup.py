@@ -0,0 +1,103 @@
+"""Tests for cached nameserver lookups"""
+import asyncio
+from types import SimpleNamespace
+
+import aiodns
+import pytest
+
+import r53ns_monitor as r53ns
+
+NS = 'ns-1.awsdns-01.org'
+
+
+def _record(addr=None, ttl=300):
+    data = SimpleNamespace(addr=addr) if addr else SimpleNamespace(cname='alias.example.com')
+    return SimpleNamespace(data=data, ttl=ttl)
+
+
+class _Resolver:
+    """Stub resolver answering query_dns() from a queue of answers or errors"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.queries = []
+
+    async def query_dns(self, name, qtype):
+        self.queries.append((name, qtype))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return SimpleNamespace(answer=answer)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    monkeypatch.setattr(r53ns, '_dns_cache', {})
+    clock = _Clock()
+    monkeypatch.setattr(r53ns.time, 'monotonic', clock)
+    return clock
+
+
+def _lookup(resolver, qtype='A'):
+    return asyncio.run(r53ns._lookup(resolver, NS, qtype))
+
+
+def test_answer_is_cached():
+    resolver = _Resolver([_record('205.251.192.1'), _record('205.251.192.9')])
+    assert _lookup(resolver) == frozenset({'205.251.192.1', '205.251.192.9'})
+    assert _lookup(resolver) == frozenset({'205.251.192.1', '205.251.192.9'})
+    assert resolver.queries == [(NS, 'A')]
+
+
+def test_cache_is_per_query_type():
+    resolver = _Resolver([_record('205.251.192.1')], [_record('2600:9000:5300:100::1')])
+    assert _lookup(resolver, 'A') == frozenset({'205.251.192.1'})
+    assert _lookup(resolver, 'AAAA') == frozenset({'2600:9000:5300:100::1'})
+    assert resolver.queries == [(NS, 'A'), (NS, 'AAAA')]
+
+
+def test_cache_expires_after_capped_ttl(clock):
+    resolver = _Resolver([_record('205.251.192.1', ttl=172800)], [_record('205.251.192.2')])
+    assert _lookup(resolver) == frozenset({'205.251.192.1'})
+    clock.now += r53ns.DNS_CACHE_MAX_TTL - 1
+    assert _lookup(resolver) == frozenset({'205.251.192.1'})
+    clock.now += 1
+    assert _lookup(resolver) == frozenset({'205.251.192.2'})
+    assert len(resolver.queries) == 2
+
+
+def test_cache_expires_after_short_ttl(clock):
+    resolver = _Resolver([_record('205.251.192.1', ttl=5), _record('205.251.192.9', ttl=30)], [_record('205.251.192.2')])
+    _lookup(resolver)
+    clock.now += 5
+    assert _lookup(resolver) == frozenset({'205.251.192.2'})
+
+
+def test_cname_only_answer_is_empty_and_not_cached():
+    resolver = _Resolver([_record()], [_record('205.251.192.1')])
+    assert _lookup(resolver) == frozenset()
+    assert _lookup(resolver) == frozenset({'205.251.192.1'})
+
+
+@pytest.mark.parametrize('code', [aiodns.error.ARES_ENODATA, aiodns.error.ARES_ENOTFOUND])
+def test_no_answer_is_empty_and_not_cached(code):
+    resolver = _Resolver(aiodns.error.DNSError(code, 'no answer'), [_record('2600:9000:5300:100::1')])
+    assert _lookup(resolver, 'AAAA') == frozenset()
+    assert _lookup(resolver, 'AAAA') == frozenset({'2600:9000:5300:100::1'})
+
+
+@pytest.mark.parametrize('code', [aiodns.error.ARES_ETIMEOUT, aiodns.error.ARES_ESERVFAIL, aiodns.error.ARES_EREFUSED])
+def test_lookup_failure_propagates(code):
+    resolver = _Resolver(aiodns.error.DNSError(code, 'failed'))
+    with pytest.raises(aiodns.error.DNSError) as excinfo:
+        _lookup(resolver)
+    assert excinfo.value.args[0] == code
+    assert r53ns._dns_cache == {}
@@ -0,0 +1,166 @@
+"""Tests for the JSONL history file"""
+import datetime
+import json
+
+import r53ns_monitor as r53ns
+
+NOW = datetime.datetime(2026, 10, 15, 12, 0, 0)
+
+
+def _monitor(history_file, retention_days=30, retention_entries=1000):
+    monitor = object.__new__(r53ns.Route53NameserverMonitor)
+    monitor.config = {'monitoring': {'retention_days': retention_days, 'retention_entries': retention_entries}}
+    monitor.history_file = str(history_file)
+    monitor._last_compaction = 0.0
+    return monitor
+
+
+def _line(timestamp, zone='Z111'):
+    return json.dumps({'timestamp': timestamp.isoformat(), 'delegation_sets': {zone: {}}}) + '\n'
+
+
+def _timestamps(history_file):
+    return [json.loads(line)['timestamp'] for line in history_file.read_text().splitlines()]
+
+
+def test_retention_cutoff_boundary(tmp_path):
+    history_file = tmp_path / 'history.jsonl'
+    # Entries are kept while their age in whole days is <= retention_days
+    cutoff = NOW - datetime.timedelta(days=31)
+    history_file.write_text(''.join([
+        _line(cutoff - datetime.timedelta(seconds=1)),
+        _line(cutoff),
+        _line(cutoff + datetime.timedelta(seconds=1)),
+        _line(NOW)
+    ]))
+    monitor = _monitor(history_file)
+    monitor._apply_retention_policy(NOW)
+    assert _timestamps(history_file) == [
+        (cutoff + datetime.timedelta(seconds=1)).isoformat(), NOW.isoformat()
+    ]
+    assert monitor._last_compaction > 0
+    assert not (tmp_path / 'history.jsonl.tmp').exists()
+
+
+def test_compaction_drops_corrupt_and_out_of_order_lines(tmp_path):
+    history_file = tmp_path / 'history.jsonl'
+    recent = NOW - datetime.timedelta(days=1)
+    expired = NOW - datetime.timedelta(days=90)
+    history_file.write_text(''.join([
+        '{"timestamp": "torn',
+        '\n',
+        _line(recent, 'Z111'),
+        _line(expired, 'Z222'),  # Out of order, e.g. after a clock change
+        '[]\n',
+        '{"delegation_sets": {}}\n',
+        _line(NOW, 'Z333'),
+        '{"timestamp": "2026-10-15T11:59'  # Torn final append
+    ]))
+    _monitor(history_file)._apply_retention_policy(NOW)
+    lines = [json.loads(line) for line in history_file.read_text().splitlines()]
+    assert [list(entry['delegation_sets']) for entry in lines] == [['Z111'], ['Z333']]
+
+
+def test_compaction_keeps_newest_entries(tmp_path):
+    history_file = tmp_path / 'history.jsonl'
+    history_file.write_text(''.join(_line(NOW - datetime.timedelta(hours=h)) for h in range(5, 0, -1)) + 'corrupt\n')
+    _monitor(history_file, retention_entries=3)._apply_retention_policy(NOW)
+    assert _timestamps(history_file) == [(NOW - datetime.timedelta(hours=h)).isoformat() for h in (3, 2, 1)]
+
+
+LEGACY_HISTORY = {
+    'history': [
+        {
+            'timestamp': '2026-01-01T00:00:00',
+            'delegation_sets': {
+                '/hostedzone/Z111': {
+                    'zone_name': 'example.com',
+                    'nameservers': {
+                        'ns-2.awsdns-02.net': {'ipv4': ['205.251.192.2'], 'ipv6': ['2600:9000:5300:200::1']},
+                        'ns-1.awsdns-01.org': {'ipv4': ['205.251.192.1', '205.251.192.9'], 'ipv6': []}
+                    }
+                }
+            }
+        },
+        {
+            'timestamp': '2026-01-02T00:00:00',
+            'delegation_sets': {
+                '/hostedzone/Z222': {
+                    'zone_name': 'example.org',
+                    'nameservers': {'ns-1.awsdns-01.org': {'ipv4': ['205.251.192.1']}}
+                }
+            }
+        }
+    ]
+}
+
+
+def _runtime_str(value):
+    """An equal string that is not the interned literal"""
+    return ''.join(list(value))
+
+
+def _migrated(tmp_path):
+    (tmp_path / 'history.json').write_text(json.dumps(LEGACY_HISTORY))
+    monitor = _monitor(tmp_path / 'history.jsonl')
+    monitor._migrate_legacy_history()
+    return monitor
+
+
+def test_legacy_history_is_migrated_to_columnar_jsonl(tmp_path):
+    monitor = _migrated(tmp_path)
+    entries = list(monitor.load_history(monitor.history_file))
+    assert [entry['timestamp'] for entry in entries] == ['2026-01-01T00:00:00', '2026-01-02T00:00:00']
+    # Written columnar, nameservers sorted with their addresses alongside
+    assert entries[0]['delegation_sets'] == {
+        '/hostedzone/Z111': {
+            'zone_name': 'example.com',
+            'ns': ['ns-1.awsdns-01.org', 'ns-2.awsdns-02.net'],
+            'ipv4': [['205.251.192.1', '205.251.192.9'], ['205.251.192.2']],
+            'ipv6': [[], ['2600:9000:5300:200::1']]
+        }
+    }
+    assert entries[1]['delegation_sets']['/hostedzone/Z222']['ipv6'] == [[]]
+
+
+def test_migration_keeps_existing_jsonl(tmp_path):
+    (tmp_path / 'history.jsonl').write_text(_line(NOW))
+    _migrated(tmp_path)
+    assert _timestamps(tmp_path / 'history.jsonl') == [NOW.isoformat()]
+
+
+def test_columnar_history_round_trips(tmp_path):
+    monitor = _migrated(tmp_path)
+    state = {}
+    for entry in monitor.load_history(monitor.history_file):
+        state.update(r53ns._from_history(entry['delegation_sets']))
+    assert state['/hostedzone/Z111'] == {
+        'zone_name': 'example.com',
+        'ns': ('ns-1.awsdns-01.org', 'ns-2.awsdns-02.net'),
+        'ipv4': (frozenset({'205.251.192.1', '205.251.192.9'}), frozenset({'205.251.192.2'})),
+        'ipv6': (frozenset(), frozenset({'2600:9000:5300:200::1'}))
+    }
+    # Written and read back again, the state is unchanged
+    reloaded = r53ns._from_history(json.loads(r53ns._dumps(state)))
+    assert reloaded == state
+
+    # Unchanged state seeded from history compares equal and is not appended again
+    monitor._last_state = state
+    size = (tmp_path / 'history.jsonl').stat().st_size
+    monitor.save_current_state({'/hostedzone/Z111': dict(state['/hostedzone/Z111'])})
+    assert (tmp_path / 'history.jsonl').stat().st_size == size
+
+
+def test_history_names_are_interned():
+    delegation_sets = {
+        _runtime_str('/hostedzone/Z333'): {
+            'zone_name': 'example.net',
+            'ns': [_runtime_str('ns-3.awsdns-03.co.uk')],
+            'ipv4': [['205.251.192.3']],
+            'ipv6': [[]]
+        }
+    }
+    state = r53ns._from_history(delegation_sets)
+    [(zone_id, info)] = state.items()
+    assert zone_id is r53ns.sys.intern(_runtime_str('/hostedzone/Z333'))
+    assert info['ns'][0] is r53ns.sys.intern(_runtime_str('ns-3.awsdns-03.co.uk'))
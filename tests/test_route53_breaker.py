@@ -0,0 +1,123 @@
+"""Tests for the Route53 circuit breaker"""
+import asyncio
+
+import pytest
+
+import r53ns_monitor as r53ns
+
+
+class ClientError(Exception):
+    """Shaped like botocore's ClientError"""
+
+    def __init__(self, code, status):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}
+
+
+class _Limiter:
+    async def __aenter__(self):
+        pass
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class _Route53Client:
+    """Stub client that raises queued errors, then succeeds"""
+
+    def __init__(self):
+        self.errors = []
+        self.calls = 0
+
+    async def get_hosted_zone(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {'HostedZone': {'Id': kwargs['Id']}}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(r53ns.time, 'monotonic', clock)
+    return clock
+
+
+def _monitor():
+    monitor = object.__new__(r53ns.Route53NameserverMonitor)
+    monitor.route53_client = _Route53Client()
+    monitor._r53_limiter = _Limiter()
+    monitor._r53_failures = 0
+    monitor._r53_open_until = 0.0
+    return monitor
+
+
+def _fail(monitor, error, times=1):
+    """Make `times` calls that each raise `error`"""
+    monitor.route53_client.errors.extend([error] * times)
+    for _ in range(times):
+        with pytest.raises(type(error)):
+            asyncio.run(monitor._route53('get_hosted_zone', Id='Z111'))
+
+
+def _succeed(monitor):
+    assert asyncio.run(monitor._route53('get_hosted_zone', Id='Z111')) == {'HostedZone': {'Id': 'Z111'}}
+
+
+def test_opens_after_threshold(clock):
+    monitor = _monitor()
+    _fail(monitor, ClientError('Throttling', 400), r53ns.R53_BREAKER_THRESHOLD - 1)
+    assert monitor._r53_open_until == 0.0
+    _fail(monitor, ClientError('ServiceUnavailable', 503))
+    assert monitor._r53_open_until == clock.now + r53ns.R53_BREAKER_RESET
+
+
+def test_success_resets_failures(clock):
+    monitor = _monitor()
+    _fail(monitor, ConnectionResetError(), r53ns.R53_BREAKER_THRESHOLD - 1)
+    _succeed(monitor)
+    assert monitor._r53_failures == 0
+    _fail(monitor, ConnectionResetError())
+    assert monitor._r53_open_until == 0.0
+
+
+def test_reopens_on_first_failure_after_pause(clock):
+    monitor = _monitor()
+    _fail(monitor, asyncio.TimeoutError(), r53ns.R53_BREAKER_THRESHOLD)
+    reopened = monitor._r53_open_until
+
+    # Failures while open do not extend the pause
+    clock.now += 10
+    _fail(monitor, asyncio.TimeoutError())
+    assert monitor._r53_open_until == reopened
+
+    # The first failure once the pause is over opens it again
+    clock.now = reopened
+    _fail(monitor, asyncio.TimeoutError())
+    assert monitor._r53_open_until == clock.now + r53ns.R53_BREAKER_RESET
+
+
+def test_closes_after_success_following_pause(clock):
+    monitor = _monitor()
+    _fail(monitor, ClientError('InternalError', 500), r53ns.R53_BREAKER_THRESHOLD)
+    clock.now = monitor._r53_open_until
+    _succeed(monitor)
+    _fail(monitor, ClientError('InternalError', 500))
+    assert monitor._r53_failures == 1
+    assert monitor._r53_open_until <= clock.now
+
+
+@pytest.mark.parametrize('code', ['NoSuchHostedZone', 'AccessDenied', 'InvalidInput'])
+def test_request_errors_are_not_counted(clock, code):
+    monitor = _monitor()
+    _fail(monitor, ClientError(code, 400), r53ns.R53_BREAKER_THRESHOLD * 2)
+    assert monitor._r53_failures == 0
+    assert monitor._r53_open_until == 0.0
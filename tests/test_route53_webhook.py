@@ -0,0 +1,201 @@
+"""Tests for the Route53 change-event webhook"""
+import asyncio
+import base64
+import datetime
+import json
+import time
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.x509.oid import NameOID
+
+import r53ns_monitor as r53ns
+
+TOPIC_ARN = 'arn:aws:sns:us-east-1:123456789012:route53-changes'
+CERT_URL = 'https://sns.us-east-1.amazonaws.com/SimpleNotificationService-0000000000000000000000.pem'
+
+# Stand-in for the SNS signing certificate
+_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+_NAME = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'sns.amazonaws.com')])
+_CERT = (
+    x509.CertificateBuilder()
+    .subject_name(_NAME)
+    .issuer_name(_NAME)
+    .public_key(_KEY.public_key())
+    .serial_number(1)
+    .not_valid_before(datetime.datetime(2026, 1, 1))
+    .not_valid_after(datetime.datetime(2036, 1, 1))
+    .sign(_KEY, hashes.SHA256())
+)
+_CERT_PEM = _CERT.public_bytes(serialization.Encoding.PEM)
+
+
+class _CertResponse:
+    content = _CERT_PEM
+
+    def raise_for_status(self):
+        pass
+
+
+class _CertClient:
+    """Serves the test certificate in place of the shared httpx client"""
+
+    def __init__(self):
+        self.fetched = []
+
+    async def get(self, url, **kwargs):
+        self.fetched.append(url)
+        return _CertResponse()
+
+
+def _monitor(last_checked=None):
+    """Monitor with one zone waiting on the schedule, without AWS or config"""
+    monitor = object.__new__(r53ns.Route53NameserverMonitor)
+    zone = r53ns.HostedZone('example.com', 'Example', '#dns-alerts', 'high', 'production', 300)
+    monitor.sns_topic_arns = frozenset({TOPIC_ARN})
+    monitor._zone_id_cache = {'example.com': '/hostedzone/Z111'}
+    monitor._schedule = [(time.monotonic() + 300, 0, zone)]
+    monitor._last_checked = {} if last_checked is None else {'example.com': last_checked}
+    monitor._wakeup = asyncio.Event()
+    return monitor
+
+
+def _sign(envelope):
+    """Sign an envelope the way SNS does for SignatureVersion 2"""
+    fields = r53ns._SNS_SIGNED_FIELDS[envelope['Type']]
+    string_to_sign = ''.join(f"{f}\n{envelope[f]}\n" for f in fields if envelope.get(f) is not None)
+    signature = _KEY.sign(string_to_sign.encode(), padding.PKCS1v15(), hashes.SHA256())
+    envelope.update({
+        'SignatureVersion': '2',
+        'Signature': base64.b64encode(signature).decode(),
+        'SigningCertURL': CERT_URL
+    })
+    return envelope
+
+
+def _envelope(hosted_zone_id, topic_arn=TOPIC_ARN):
+    """Signed SNS notification wrapping an EventBridge CloudTrail event"""
+    event = {
+        "version": "0",
+        "id": "6a7e8feb-b491-4cf7-a9f1-bf3703467718",
+        "detail-type": "AWS API Call via CloudTrail",
+        "source": "aws.route53",
+        "account": "123456789012",
+        "time": "2026-10-15T12:00:00Z",
+        "region": "us-east-1",
+        "resources": [],
+        "detail": {
+            "eventVersion": "1.08",
+            "eventSource": "route53.amazonaws.com",
+            "eventName": "ChangeResourceRecordSets",
+            "awsRegion": "us-east-1",
+            "requestParameters": {
+                "hostedZoneId": hosted_zone_id,
+                "changeBatch": {
+                    "changes": [{
+                        "action": "UPSERT",
+                        "resourceRecordSet": {"name": "example.com", "type": "NS", "tTL": 172800}
+                    }]
+                }
+            }
+        }
+    }
+    return _sign({
+        "Type": "Notification",
+        "MessageId": "22b80b92-fdea-4c2c-8f9d-bdfb0c7bf324",
+        "TopicArn": topic_arn,
+        "Message": json.dumps(event),
+        "Timestamp": "2026-10-15T12:00:01.000Z"
+    })
+
+
+def _post(*envelopes, monitor=None, cached_key=True):
+    """POST SNS envelopes to the webhook; returns (monitor, [(status code, JSON body)])"""
+    async def run():
+        nonlocal monitor
+        monitor = monitor or _monitor()
+        r53ns.monitor = monitor
+        r53ns._sns_keys.clear()
+        if cached_key:
+            r53ns._sns_keys[CERT_URL] = _KEY.public_key()
+        try:
+            client = r53ns.asgi_app.test_client()
+            results = []
+            for envelope in envelopes:
+                response = await client.post(
+                    '/webhook/route53',
+                    data=json.dumps(envelope),
+                    headers={'Content-Type': 'text/plain; charset=UTF-8', 'x-amz-sns-message-type': envelope['Type']}
+                )
+                results.append((response.status_code, await response.get_json()))
+            return monitor, results
+        finally:
+            r53ns.monitor = None
+    return asyncio.run(run())
+
+
+def test_bare_zone_id_schedules_check():
+    monitor, [(status, body)] = _post(_envelope('Z111'))
+    assert status == 200
+    assert body == {'status': 'scheduled'}
+    assert monitor._schedule[0][0] <= time.monotonic()
+    assert monitor._wakeup.is_set()
+
+
+def test_prefixed_zone_id_schedules_check():
+    _, [(status, body)] = _post(_envelope('/hostedzone/Z111'))
+    assert status == 200
+    assert body == {'status': 'scheduled'}
+
+
+def test_unmonitored_zone_is_ignored():
+    monitor, [(status, body)] = _post(_envelope('Z999'))
+    assert status == 200
+    assert body == {'status': 'ignored'}
+    assert not monitor._wakeup.is_set()
+
+
+def test_signing_certificate_is_fetched_and_cached():
+    client = _CertClient()
+    http, r53ns._http = r53ns._http, client
+    try:
+        _, results = _post(_envelope('Z111'), _envelope('Z999'), cached_key=False)
+    finally:
+        r53ns._http = http
+    assert [body['status'] for _, body in results] == ['scheduled', 'ignored']
+    assert client.fetched == [CERT_URL]
+
+
+def test_unknown_topic_is_rejected():
+    monitor, [(status, _)] = _post(_envelope('Z111', topic_arn='arn:aws:sns:us-east-1:999999999999:other'))
+    assert status == 403
+    assert not monitor._wakeup.is_set()
+
+
+def test_tampered_message_is_rejected():
+    envelope = _envelope('Z111')
+    envelope['Message'] = envelope['Message'].replace('Z111', 'Z112')
+    monitor, [(status, body)] = _post(envelope)
+    assert status == 403
+    assert body == {'error': 'Invalid signature'}
+    assert not monitor._wakeup.is_set()
+
+
+def test_foreign_signing_certificate_is_rejected():
+    envelope = _envelope('Z111')
+    envelope['SigningCertURL'] = 'https://attacker.example.com/sns.us-east-1.amazonaws.com/cert.pem'
+    _, [(status, _)] = _post(envelope)
+    assert status == 403
+
+
+def test_repeat_events_are_ignored_while_queued():
+    _, results = _post(_envelope('Z111'), _envelope('Z111'))
+    assert [body['status'] for _, body in results] == ['scheduled', 'ignored']
+
+
+def test_recently_checked_zone_is_ignored():
+    monitor, [(status, body)] = _post(_envelope('Z111'), monitor=_monitor(last_checked=time.monotonic()))
+    assert status == 200
+    assert body == {'status': 'ignored'}
+    assert monitor._schedule[0][0] > time.monotonic()
@@ -0,0 +1,70 @@
+"""Tests for the Slack interaction endpoint"""
+import asyncio
+import json
+import re
+
+import pytest
+
+import r53ns_monitor as r53ns
+
+RESOLVE = {'action_id': 'resolve_nameserver_change', 'block_id': 'b1', 'type': 'button', 'value': 'resolve'}
+OTHER = {'action_id': 'acknowledge', 'block_id': 'b2', 'type': 'button', 'value': 'ack'}
+
+
+def _payload(actions, domains=('example.com',), payload_type='block_actions'):
+    """Interaction payload for a click on an alert covering `domains`"""
+    sections = [
+        {'type': 'section', 'fields': [{'type': 'mrkdwn', 'text': f'*Domain:*\n{domain}'}]}
+        for domain in domains
+    ]
+    return json.dumps({
+        'type': payload_type,
+        'user': {'id': 'U123', 'name': 'oncall'},
+        'actions': actions,
+        'message': {'attachments': [{'blocks': sections}, {'blocks': [{'type': 'actions', 'elements': [RESOLVE]}]}]}
+    })
+
+
+PAYLOADS = {
+    'resolve': _payload([RESOLVE]),
+    'resolve_many': _payload([RESOLVE], ('example.com', 'example.org', 'example.net')),
+    'resolve_second_action': _payload([OTHER, RESOLVE]),
+    'other_action': _payload([OTHER]),
+    'not_block_actions': _payload([RESOLVE], payload_type='interactive_message'),
+    'nested_before_action_id': _payload([{'text': {'type': 'plain_text', 'text': 'Resolve'}, **RESOLVE}]),
+}
+
+
+def _click(payload, fast_path=True):
+    """POST an interaction; returns (status code, domains resolved)"""
+    resolved = []
+
+    async def send_resolution(domains):
+        resolved.append(domains)
+        return r53ns._json_response({'status': 'resolved'})
+
+    async def run():
+        client = r53ns.asgi_app.test_client()
+        response = await client.post('/slack/interactions', form={'payload': payload})
+        return response.status_code
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(r53ns, '_send_resolution', send_resolution)
+        if not fast_path:
+            mp.setattr(r53ns, '_RESOLVE_ACTION_RE', re.compile(rb'(?!)'))
+        status = asyncio.run(run())
+    return status, resolved
+
+
+@pytest.mark.parametrize('name', PAYLOADS)
+def test_fast_path_agrees_with_parsed_path(name):
+    assert _click(PAYLOADS[name]) == _click(PAYLOADS[name], fast_path=False)
+
+
+def test_resolve_click_resolves_every_domain():
+    assert _click(PAYLOADS['resolve_many']) == (200, [['example.com', 'example.org', 'example.net']])
+
+
+def test_resolve_in_later_action_is_not_matched():
+    assert not r53ns._RESOLVE_ACTION_RE.search(PAYLOADS['resolve_second_action'].encode())
+    assert _click(PAYLOADS['resolve_second_action']) == (400, [])
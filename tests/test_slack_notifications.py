@@ -0,0 +1,119 @@
+"""Tests for coalesced Slack alerts"""
+import asyncio
+import json
+
+import pytest
+
+import r53ns_monitor as r53ns
+
+WEBHOOK = 'https://hooks.slack.com/services/T000/B000/XXXX'
+
+
+class _Response:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ''
+
+
+class _Slack:
+    """Records webhook posts in place of the shared httpx client"""
+
+    def __init__(self, responses=()):
+        self.posts = []
+        self.responses = list(responses)
+
+    async def post(self, url, content=None, **kwargs):
+        assert url == WEBHOOK
+        self.posts.append((asyncio.get_running_loop().time(), json.loads(content)))
+        return self.responses.pop(0) if self.responses else _Response()
+
+    def zones(self, index):
+        """Domains alerted in the index-th message"""
+        blocks = self.posts[index][1]['attachments'][0]['blocks']
+        return [block['fields'][0]['text'].split('\n', 1)[1] for block in blocks if block['type'] == 'section']
+
+
+@pytest.fixture
+def slack(monkeypatch):
+    slack = _Slack()
+    monkeypatch.setattr(r53ns, '_http', slack)
+    monkeypatch.setattr(r53ns, 'SLACK_COALESCE_WINDOW', 0.05)
+    monkeypatch.setattr(r53ns, 'SLACK_BATCH_INTERVAL', 0.02)
+    return slack
+
+
+def _monitor():
+    monitor = object.__new__(r53ns.Route53NameserverMonitor)
+    monitor.slack_webhook = WEBHOOK
+    monitor._pending_changes = r53ns.collections.deque()
+    monitor._flush_task = None
+    return monitor
+
+
+def _change(zone_name, ns='ns-1.awsdns-01.org'):
+    return {
+        "type": "ip_change",
+        "zone_name": zone_name,
+        "delegation_set": "Z111",
+        "nameserver": ns,
+        "old_ips": {"ipv4": ["192.0.2.1"], "ipv6": []},
+        "new_ips": {"ipv4": ["192.0.2.2"], "ipv6": []}
+    }
+
+
+def test_changes_within_window_are_coalesced(slack):
+    async def run():
+        monitor = _monitor()
+        await monitor.send_slack_notification([_change('a.example.com')])
+        await monitor.send_slack_notification([_change('b.example.com'), _change('a.example.com', 'ns-2.awsdns-02.net')])
+        await asyncio.sleep(0)
+        assert slack.posts == []
+        await asyncio.sleep(r53ns.SLACK_COALESCE_WINDOW * 2)
+        return monitor
+    monitor = asyncio.run(run())
+    assert len(slack.posts) == 1
+    # One section per zone, holding all of its nameserver changes
+    assert slack.zones(0) == ['a.example.com', 'b.example.com']
+    section = slack.posts[0][1]['attachments'][0]['blocks'][1]['text']['text']
+    assert 'ns-1.awsdns-01.org' in section and 'ns-2.awsdns-02.net' in section
+    assert monitor._flush_task is None and not monitor._pending_changes
+
+
+def test_shutdown_flushes_pending_changes(slack):
+    async def run():
+        monitor = _monitor()
+        await monitor.send_slack_notification([_change('a.example.com')])
+        flush_task = monitor._flush_task
+        await monitor.flush_notifications()
+        assert len(slack.posts) == 1
+        # The window's own flush is cancelled rather than sending again
+        await asyncio.sleep(r53ns.SLACK_COALESCE_WINDOW * 2)
+        assert flush_task.cancelled()
+    asyncio.run(run())
+    assert len(slack.posts) == 1
+    assert slack.zones(0) == ['a.example.com']
+
+
+def test_large_bursts_are_split_and_spaced(slack):
+    zones = [f'zone{i:03}.example.com' for i in range(2 * r53ns.SLACK_MAX_ZONES_PER_ALERT + 4)]
+    monitor = _monitor()
+    monitor._pending_changes.extend(_change(zone) for zone in zones)
+    asyncio.run(monitor.flush_notifications())
+    assert len(slack.posts) == 3
+    assert [len(slack.zones(i)) for i in range(3)] == [48, 48, 4]
+    assert sum((slack.zones(i) for i in range(3)), []) == zones
+    # Header and context blocks plus the zone sections stay within Slack's limit of 50
+    assert all(len(body['attachments'][0]['blocks']) <= 50 for _, body in slack.posts)
+    gaps = [b[0] - a[0] for a, b in zip(slack.posts, slack.posts[1:])]
+    assert all(gap >= r53ns.SLACK_BATCH_INTERVAL for gap in gaps)
+
+
+def test_rate_limited_batch_is_retried_after_delay(slack):
+    slack.responses = [_Response(429, {'Retry-After': '0.05'})]
+    monitor = _monitor()
+    monitor._pending_changes.append(_change('a.example.com'))
+    asyncio.run(monitor.flush_notifications())
+    assert len(slack.posts) == 2
+    assert slack.posts[0][1] == slack.posts[1][1]
+    assert slack.posts[1][0] - slack.posts[0][0] >= 0.05